@@ -1,58 +1,162 @@
 import os
-import json
-import random
+import re
+import hashlib
+import time
+import uuid
+import atexit
+import queue
 import logging
-from logging.handlers import RotatingFileHandler
+import threading
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 from datetime import datetime
-from functools import wraps
-from flask import Flask, render_template, request, jsonify, session, flash, redirect, url_for, has_request_context
+from functools import wraps, lru_cache
+from operator import itemgetter
+from flask import Flask, render_template, request, jsonify, session, g, flash, redirect, url_for, has_request_context, copy_current_request_context
+from flask.json.provider import JSONProvider
+from flask.sessions import SecureCookieSessionInterface
 from flask_wtf.csrf import CSRFProtect
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from flask_caching import Cache
+from flask_compress import Compress
+from markupsafe import Markup
+import numpy as np
+import orjson
+import redis
+import requests
 import tweepy
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 from wordcloud import WordCloud
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-log_handler = RotatingFileHandler('app.log', maxBytes=10485760, backupCount=5)  # 10MB per file, keep 5 backups
-log_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        log_handler,
-        logging.StreamHandler()
-    ]
-)
+# Configure logging - request threads only enqueue records; a background listener formats and writes them
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(log_formatter)
+log_handlers = [stream_handler]
+# gunicorn sets SERVER_SOFTWARE before loading the app; its workers would each roll app.log over on their own and
+# clobber one another's records, so under gunicorn logs only go to stdout for the platform to collect
+if not os.getenv('SERVER_SOFTWARE', '').startswith('gunicorn/'):
+    log_handler = RotatingFileHandler('app.log', maxBytes=10485760, backupCount=5)  # 10MB per file, keep 5 backups
+    log_handler.setFormatter(log_formatter)
+    log_handlers.append(log_handler)
+
+log_queue_handler = QueueHandler(queue.Queue(-1))
+log_listener = None
+
+def _start_log_listener():
+    """Start the thread that writes queued records; rerun in forked workers, which don't inherit it."""
+    global log_listener
+    # Fresh queue so a child never inherits a queue lock held by the parent's listener at fork time
+    log_queue_handler.queue = queue.Queue(-1)
+    log_listener = QueueListener(log_queue_handler.queue, *log_handlers, respect_handler_level=True)
+    log_listener.start()
+
+def _stop_log_listener():
+    """Flush and stop the current listener on shutdown."""
+    global log_listener
+    if log_listener is not None:
+        log_listener.stop()
+        log_listener = None
+
+_start_log_listener()
+os.register_at_fork(after_in_child=_start_log_listener)
+atexit.register(_stop_log_listener)
+
+root_logger = logging.getLogger()
+root_logger.setLevel(logging.INFO)
+root_logger.addHandler(log_queue_handler)
 logger = logging.getLogger(__name__)
 
+class OrjsonProvider(JSONProvider):
+    """JSON provider that serializes with orjson instead of the stdlib json module."""
+    option = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(self, obj, **kwargs):
+        option = self.option
+        if kwargs.get('sort_keys'):
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response instead of decoding to str and re-encoding
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, option=self.option), mimetype='application/json')
+
+class SHA256SessionInterface(SecureCookieSessionInterface):
+    """Signed cookie sessions using HMAC-SHA256 instead of Flask's default SHA-1."""
+    digest_method = staticmethod(hashlib.sha256)
+
+# Every worker must sign sessions with the same key, so refuse to start without one
+SECRET_KEY = os.getenv('SECRET_KEY')
+if not SECRET_KEY:
+    raise RuntimeError("SECRET_KEY environment variable is required")
+
 app = Flask(__name__)
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', os.urandom(24).hex())
+app.json = OrjsonProvider(app)
+app.session_interface = SHA256SessionInterface()
+app.config['SECRET_KEY'] = SECRET_KEY
+app.config['SESSION_COOKIE_SECURE'] = os.getenv('SESSION_COOKIE_SECURE', 'True').lower() == 'true'
+app.config['PERMANENT_SESSION_LIFETIME'] = 3600  # 1 hour
 csrf = CSRFProtect(app)
 
-# Rate limiting
+# Compress HTML and JSON responses, preferring Brotli when the client accepts it
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_LEVEL'] = 4
+app.config['COMPRESS_BR_LEVEL'] = 4
+app.config['COMPRESS_MIN_SIZE'] = 500
+Compress(app)
+
+# Optional Redis, shared by the cache and the rate limiter through one connection pool
+REDIS_URL = os.getenv('REDIS_URL')
+redis_pool = redis.ConnectionPool.from_url(REDIS_URL) if REDIS_URL else None
+
+# Caching - Twitter search results are shared across workers when Redis is configured
+CACHE_TIMEOUT = 300  # 5 minutes
+if redis_pool:
+    cache_config = {'CACHE_TYPE': 'RedisCache', 'CACHE_REDIS_HOST': redis.Redis(connection_pool=redis_pool)}
+else:
+    cache_config = {'CACHE_TYPE': 'SimpleCache'}
+cache = Cache(app, config={**cache_config, 'CACHE_DEFAULT_TIMEOUT': CACHE_TIMEOUT})
+
+# Rate limiting - counters live in Redis when configured so limits hold across workers,
+# falling back to per-process memory while the storage is unreachable
+LIMITER_STORAGE_URI = os.getenv('LIMITER_STORAGE_URI') or REDIS_URL or 'memory://'
 limiter = Limiter(
     app=app,
     key_func=get_remote_address,
-    default_limits=["200 per day", "50 per hour"]
+    default_limits=["200 per day", "50 per hour"],
+    storage_uri=LIMITER_STORAGE_URI,
+    storage_options={'connection_pool': redis_pool} if redis_pool and LIMITER_STORAGE_URI == REDIS_URL else {},
+    strategy='fixed-window',
+    in_memory_fallback_enabled=True
 )
 
 # Twitter API credentials - check session first, then environment variables
 def get_twitter_credentials():
     """Get Twitter credentials from session or environment variables."""
-    # Only access session if we're in a request context
+    # Only access session if we're in a request context; the result is reused for the rest of the request
     if has_request_context():
-        return {
-            'api_key': session.get('TWITTER_API_KEY') or os.getenv('TWITTER_API_KEY'),
-            'api_secret': session.get('TWITTER_API_SECRET') or os.getenv('TWITTER_API_SECRET'),
-            'access_token': session.get('TWITTER_ACCESS_TOKEN') or os.getenv('TWITTER_ACCESS_TOKEN'),
-            'access_token_secret': session.get('TWITTER_ACCESS_TOKEN_SECRET') or os.getenv('TWITTER_ACCESS_TOKEN_SECRET'),
-            'bearer_token': session.get('TWITTER_BEARER_TOKEN') or os.getenv('TWITTER_BEARER_TOKEN')
-        }
+        creds = g.get('_twitter_creds')
+        if creds is None:
+            creds = g._twitter_creds = {
+                'api_key': session.get('TWITTER_API_KEY') or os.getenv('TWITTER_API_KEY'),
+                'api_secret': session.get('TWITTER_API_SECRET') or os.getenv('TWITTER_API_SECRET'),
+                'access_token': session.get('TWITTER_ACCESS_TOKEN') or os.getenv('TWITTER_ACCESS_TOKEN'),
+                'access_token_secret': session.get('TWITTER_ACCESS_TOKEN_SECRET') or os.getenv('TWITTER_ACCESS_TOKEN_SECRET'),
+                'bearer_token': session.get('TWITTER_BEARER_TOKEN') or os.getenv('TWITTER_BEARER_TOKEN')
+            }
+        return creds
     else:
         # During app initialization, only use environment variables
         return {
@@ -63,12 +167,6 @@ def get_twitter_credentials():
             'bearer_token': os.getenv('TWITTER_BEARER_TOKEN')
         }
 
-TWITTER_API_KEY = os.getenv('TWITTER_API_KEY')
-TWITTER_API_SECRET = os.getenv('TWITTER_API_SECRET')
-TWITTER_ACCESS_TOKEN = os.getenv('TWITTER_ACCESS_TOKEN')
-TWITTER_ACCESS_TOKEN_SECRET = os.getenv('TWITTER_ACCESS_TOKEN_SECRET')
-TWITTER_BEARER_TOKEN = os.getenv('TWITTER_BEARER_TOKEN')
-
 # Validate Twitter credentials
 def validate_twitter_credentials(creds=None):
     """Check if Twitter API credentials are configured."""
@@ -95,9 +193,19 @@ def validate_twitter_credentials(creds=None):
         return False
     return True
 
-# Check credentials
+# Log missing environment credentials at startup; clients are built lazily by get_twitter_client()
 TWITTER_CREDENTIALS_VALID = validate_twitter_credentials()
 
+# Pooled HTTP session shared by every Twitter client so connections to api.twitter.com stay warm
+def _build_twitter_session():
+    """Create a keep-alive session that retries transient Twitter server errors."""
+    retry = Retry(total=3, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504], raise_on_status=False)
+    http_session = requests.Session()
+    http_session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry))
+    return http_session
+
+twitter_session = _build_twitter_session()
+
 # Initialize Twitter API client (v2 only) if credentials are available
 def get_twitter_client():
     """Get or create Twitter API client with current credentials."""
@@ -106,34 +214,32 @@ def get_twitter_client():
         return None
     
     try:
-        return tweepy.Client(
-            bearer_token=creds['bearer_token'],
-            consumer_key=creds['api_key'],
-            consumer_secret=creds['api_secret'],
-            access_token=creds['access_token'],
-            access_token_secret=creds['access_token_secret']
+        return _build_twitter_client(
+            creds['bearer_token'],
+            creds['api_key'],
+            creds['api_secret'],
+            creds['access_token'],
+            creds['access_token_secret']
         )
     except Exception as e:
         logger.error(f"Failed to initialize Twitter API client: {e}")
         return None
 
-client = None
-if TWITTER_CREDENTIALS_VALID:
-    try:
-        client = tweepy.Client(
-            bearer_token=TWITTER_BEARER_TOKEN,
-            consumer_key=TWITTER_API_KEY,
-            consumer_secret=TWITTER_API_SECRET,
-            access_token=TWITTER_ACCESS_TOKEN,
-            access_token_secret=TWITTER_ACCESS_TOKEN_SECRET
-        )
-        logger.info("Twitter API client initialized successfully")
-    except Exception as e:
-        logger.error(f"Failed to initialize Twitter API client: {e}")
-        TWITTER_CREDENTIALS_VALID = False
+@lru_cache(maxsize=64)
+def _build_twitter_client(bearer_token, api_key, api_secret, access_token, access_token_secret):
+    """Create a Twitter client once per set of credentials so requests reuse it."""
+    twitter_client = tweepy.Client(
+        bearer_token=bearer_token,
+        consumer_key=api_key,
+        consumer_secret=api_secret,
+        access_token=access_token,
+        access_token_secret=access_token_secret
+    )
+    twitter_client.session = twitter_session
+    return twitter_client
 
-# Supported languages with their codes and names
-SUPPORTED_LANGUAGES = {
+# Supported languages with their codes and names (read-only)
+SUPPORTED_LANGUAGES = MappingProxyType({
     'en': 'English',
     'es': 'Spanish',
     'fr': 'French',
@@ -146,7 +252,56 @@ SUPPORTED_LANGUAGES = {
     'hi': 'Hindi',
     'zh': 'Chinese',
     'ru': 'Russian'
-}
+})
+
+# Set of language codes for O(1) validation before any API call
+_LANG_SET = frozenset(SUPPORTED_LANGUAGES)
+
+# Bound once as a template global rather than passed to every render_template call
+app.jinja_env.globals['languages'] = SUPPORTED_LANGUAGES
+
+# Sample trends shown when the Twitter API is not configured or returns nothing
+DEMO_WORDS = MappingProxyType({
+    '#Technology': 1200,
+    '#AI': 1000,
+    '#Innovation': 900,
+    '#DataScience': 850,
+    '#MachineLearning': 800,
+    '#Cloud': 750,
+    '#Cybersecurity': 700,
+    '#IoT': 650,
+    '#Blockchain': 600,
+    '#5G': 550,
+    'trending': 500,
+    'viral': 480,
+    'breaking': 460,
+    'news': 440,
+    'update': 420,
+    'latest': 400,
+    'popular': 380,
+    'hot': 360,
+    'buzz': 340,
+    'topic': 320
+})
+
+# Shared generator for word orientations
+_RNG = np.random.default_rng()
+_ORIENTATIONS = ('horizontal', 'vertical')
+
+# Characters escaped when embedding JSON in a <script> block, as Jinja's tojson does
+_HTMLSAFE_JSON = str.maketrans({'<': '\\u003c', '>': '\\u003e', '&': '\\u0026', "'": '\\u0027'})
+
+# Tweet metrics returned to the client, fetched with a single itemgetter call
+_METRIC_KEYS = ('retweet_count', 'reply_count', 'like_count')
+_get_metrics = itemgetter(*_METRIC_KEYS)
+
+# Hashtags, or plain words of at least 4 letters (any script); matches are case-insensitive by construction
+_TOKEN_RE = re.compile(r'#\w+|[^\W\d_]{4,}')
+# Links are removed before tokenizing, or every t.co URL would add 'https' and its shortcode's letter runs as words
+_URL_RE = re.compile(r'https?://\S+')
+
+class SearchThrottled(Exception):
+    """Raised when no search token frees up before the caller's deadline."""
 
 def handle_api_error(f):
     @wraps(f)
@@ -156,116 +311,284 @@ def handle_api_error(f):
         except tweepy.TweepyException as e:
             logger.error(f"Twitter API error: {str(e)}")
             return jsonify({'error': 'Twitter API error occurred'}), 500
+        except SearchThrottled as e:
+            logger.warning(f"Search throttled: {str(e)}")
+            return jsonify({'error': str(e)}), 429
         except Exception as e:
             logger.error(f"Unexpected error: {str(e)}")
             return jsonify({'error': 'An unexpected error occurred'}), 500
     return decorated_function
 
-def validate_location(location):
-    """Validate location input."""
+# Calls currently being computed, keyed by function and arguments (see singleflight)
+SINGLEFLIGHT_TIMEOUT = 10  # seconds a duplicate caller waits before doing the work itself
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+class _InflightCall:
+    """Result slot shared by all callers of an in-progress call."""
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+def _credentials_fingerprint():
+    """Short digest of the bearer token in use, so calls made with different credentials are never merged."""
+    bearer_token = get_twitter_credentials().get('bearer_token') or ''
+    return hashlib.blake2b(bearer_token.encode(), digest_size=16).hexdigest()
+
+def singleflight(f):
+    """Collapse concurrent calls with the same arguments and credentials into one; duplicates wait for its result."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        # The wrapped lookups use the caller's session credentials, so a call made with another user's
+        # (possibly invalid) credentials must not hand this caller its result or its error
+        key = (f.__name__, _credentials_fingerprint(), args, tuple(sorted(kwargs.items())))
+        with _inflight_lock:
+            call = _inflight.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _inflight[key] = _InflightCall()
+        
+        if not is_leader:
+            if not call.done.wait(timeout=SINGLEFLIGHT_TIMEOUT):
+                return f(*args, **kwargs)
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = f(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with _inflight_lock:
+                _inflight.pop(key, None)
+            call.done.set()
+    return decorated_function
+
+def validate_input(location, lang):
+    """Validate location and language input."""
     if not location or len(location.strip()) == 0:
         return False, "Location cannot be empty"
     if len(location) > 100:
         return False, "Location name is too long"
+    if lang not in _LANG_SET:
+        return False, "Unsupported language"
     return True, None
 
-@handle_api_error
-def fetch_top_trends_by_location(location, lang='en'):
-    """Fetch top trends for a given location using v2 API."""
+class _TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available or its timeout runs out."""
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """Take a token, returning False instead of waiting past timeout seconds for one."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+# Tweepy only comma-joins list values, so pass the fields pre-joined rather than as a tuple
+_TWEET_FIELDS = 'created_at,text,public_metrics'
+
+# Throttle search calls before Twitter does: 1 request/second with bursts of 10
+_search_bucket = _TokenBucket(rate=1.0, capacity=10)
+# Longest a search waits for tokens across all its pages; kept well under SINGLEFLIGHT_TIMEOUT so a throttled
+# leader fails before its followers give up waiting and each start a search of their own
+SEARCH_WAIT_TIMEOUT = 5
+
+def _throttled(method, deadline):
+    """Wrap a Client search method so every call, including each page a Paginator requests, takes a bucket token.
+
+    Raises SearchThrottled once no token can be had before deadline, a time.monotonic() value.
+    """
+    # wraps() keeps __name__, which Paginator uses to choose its pagination parameter
+    @wraps(method)
+    def throttled_method(*args, **kwargs):
+        if not _search_bucket.acquire(timeout=deadline - time.monotonic()):
+            raise SearchThrottled("Too many searches in progress, please try again shortly")
+        return method(*args, **kwargs)
+    return throttled_method
+
+def _search_recent(query, lang, max_results=100, pages=1):
+    """Search recent tweets, returning their raw data dicts rather than Tweepy objects.
+
+    Not cached itself: callers memoize what they derive from the results, each with its own timeout.
+
+    With pages > 1, up to pages * max_results tweets are collected with a Paginator.
+    """
     twitter_client = get_twitter_client()
     if twitter_client is None:
         logger.error("Twitter API credentials not configured")
         raise Exception("Twitter API is not configured. Please configure it in the settings page.")
     
+    search_kwargs = {
+        'query': f"{query} -is:retweet lang:{lang}",
+        'max_results': max_results,
+        'tweet_fields': _TWEET_FIELDS
+    }
+    search = _throttled(twitter_client.search_recent_tweets, time.monotonic() + SEARCH_WAIT_TIMEOUT)
+    if pages > 1:
+        # Pages are requested lazily, so a search that runs out of results early spends no further tokens
+        paginator = tweepy.Paginator(search, **search_kwargs)
+        return [tweet.data for tweet in paginator.flatten(limit=pages * max_results)]
+    
+    tweets = search(**search_kwargs)
+    return [tweet.data for tweet in tweets.data or []]
+
+@handle_api_error
+@singleflight
+@cache.memoize(timeout=CACHE_TIMEOUT)
+def fetch_top_trends_by_location(location, lang='en', max_results=100):
+    """Fetch top trends for a given location using v2 API."""
     logger.info(f"Fetching trends for location: {location}, language: {lang}")
     try:
         # Search for recent tweets mentioning the location
-        query = f"{location} -is:retweet lang:{lang}"
-        tweets = twitter_client.search_recent_tweets(
-            query=query,
-            max_results=100,
-            tweet_fields=['created_at', 'text', 'public_metrics']
-        )
+        tweets = _search_recent(location, lang, max_results)
         
-        if not tweets.data:
+        if not tweets:
             logger.warning(f"No tweets found for location: {location}")
             return []
         
-        # Count occurrences of hashtags and keywords
-        trend_counts = {}
-        for tweet in tweets.data:
-            # Extract hashtags and keywords
-            words = tweet.text.lower().split()
-            for word in words:
-                if word.startswith('#'):
-                    trend_counts[word] = trend_counts.get(word, 0) + tweet.public_metrics['retweet_count'] + 1
-                elif len(word) > 3 and word != location.lower():
-                    trend_counts[word] = trend_counts.get(word, 0) + 1
+        # Count occurrences of hashtags (weighted by retweets) and keywords
+        location_lower = location.lower()
+        find_tokens = _TOKEN_RE.findall
+        strip_urls = _URL_RE.sub
+        hashtag_counter = Counter()
+        word_counter = Counter()
+        for tweet in tweets:
+            weight = tweet['public_metrics']['retweet_count'] + 1
+            tokens = [tok.lower() for tok in find_tokens(strip_urls(' ', tweet['text']))]
+            # Tokens are never empty, so index 0 is a cheaper hashtag test than startswith()
+            for tag in (tok for tok in tokens if tok[0] == '#'):
+                hashtag_counter[tag] += weight
+            word_counter.update(tok for tok in tokens if tok[0] != '#' and tok != location_lower)
         
-        # Sort by count and get top 20
-        sorted_trends = sorted(trend_counts.items(), key=lambda x: x[1], reverse=True)[:20]
-        return [{'name': trend[0], 'tweet_volume': trend[1]} for trend in sorted_trends]
+        # Get top 20 by count
+        top_trends = (hashtag_counter + word_counter).most_common(20)
+        return [{'name': name, 'tweet_volume': count} for name, count in top_trends]
     except Exception as e:
         logger.error(f"Error fetching trends: {e}")
         raise
 
+def serialize_tweet(tweet):
+    """Convert a raw tweet dict from _search_recent into the dict sent to the client."""
+    return {
+        'text': tweet['text'],
+        'url': 'https://twitter.com/user/status/' + tweet['id'],
+        'metrics': dict(zip(_METRIC_KEYS, _get_metrics(tweet['public_metrics']))),
+        'created_at': tweet['created_at']
+    }
+
 @handle_api_error
-def fetch_top_5_recent_tweets(query, lang='en'):
-    """Fetch top 5 recent tweets for a given query using v2 API."""
-    twitter_client = get_twitter_client()
-    if twitter_client is None:
-        logger.error("Twitter API credentials not configured")
-        raise Exception("Twitter API is not configured. Please configure it in the settings page.")
-    
+@singleflight
+@cache.memoize(timeout=120)
+def fetch_top_5_recent_tweets(query, lang='en', max_results=10, pages=1):
+    """Fetch recent tweets for a given query using v2 API, for both prefetched popups and /fetch_tweets."""
     logger.info(f"Fetching tweets for query: {query}, language: {lang}")
     try:
-        tweets = twitter_client.search_recent_tweets(
-            query=f"{query} -is:retweet lang:{lang}",
-            max_results=10,
-            tweet_fields=['created_at', 'text', 'public_metrics']
-        )
-        if not tweets.data:
+        tweets = _search_recent(query, lang, max_results, pages)
+        if not tweets:
             logger.warning(f"No tweets found for query: {query}")
             return []
-        return [{
-            'text': tweet.text,
-            'url': f"https://twitter.com/user/status/{tweet.id}",
-            'metrics': tweet.public_metrics,
-            'created_at': tweet.created_at.isoformat()
-        } for tweet in tweets.data]
+        return [serialize_tweet(tweet) for tweet in tweets]
     except Exception as e:
         logger.error(f"Error fetching tweets: {e}")
         raise
 
+TWEET_PREFETCH_LIMIT = 10  # top trends whose already-cached tweets are sent with the word cloud
+
+def fetch_tweets_for_trends(trends, lang='en'):
+    """Tweets already cached for the top trends, keyed by trend name.
+
+    Only cache hits are used, so the word cloud never waits on Twitter or spends search quota on popups that may
+    never be opened; the rest load on click through /fetch_tweets, which fills the same memoized entries.
+    """
+    # wraps() carries memoize's make_cache_key/uncached up to the decorated function, as delete_memoized relies on
+    memoized = fetch_top_5_recent_tweets
+    tweets_lookup = {}
+    for trend in trends[:TWEET_PREFETCH_LIMIT]:
+        try:
+            tweets = cache.get(memoized.make_cache_key(memoized.uncached, trend['name'], lang))
+        except redis.RedisError as e:
+            logger.error(f"Could not read cached tweets for {trend['name']}: {e}")
+            break
+        if tweets:
+            tweets_lookup[trend['name']] = tweets
+    return tweets_lookup
+
+# WordCloud for the default canvas, created at import so gunicorn --preload workers share it copy-on-write
+_WARM_WC = WordCloud(width=800, height=600, background_color='white', prefer_horizontal=1.0)
+_WARM_WC_LOCK = threading.Lock()
+
+def to_script_json(obj):
+    """Serialize obj with orjson into markup that is safe to embed in a <script> block."""
+    return Markup(orjson.dumps(obj).decode().translate(_HTMLSAFE_JSON))
+
 def generate_wordcloud_layout(frequencies, width=800, height=600):
-    """Generate word cloud layout with font sizes, colors, tweet_volume, type, and random orientation."""
-    wordcloud = WordCloud(
-        width=width,
-        height=height,
-        background_color='white',
-        prefer_horizontal=1.0
-    ).generate_from_frequencies(frequencies)
+    """Generate word cloud layout with font sizes, colors, tweet_volume, type, and random orientation.
+
+    Layouts are cached by their frequencies, so the returned words_data is shared and must not be mutated.
+    """
+    return _cached_layout(tuple(sorted(frequencies.items())), width, height)
+
+@lru_cache(maxsize=256)
+def _cached_layout(frequency_items, width, height):
+    """Compute the word cloud layout for a hashable snapshot of the frequencies."""
+    if (width, height) == (_WARM_WC.width, _WARM_WC.height):
+        # generate_from_frequencies stores its result on the instance, so the shared one is used under a lock
+        with _WARM_WC_LOCK:
+            layout = _WARM_WC.generate_from_frequencies(dict(frequency_items)).layout_
+    else:
+        layout = WordCloud(
+            width=width,
+            height=height,
+            background_color='white',
+            prefer_horizontal=1.0
+        ).generate_from_frequencies(dict(frequency_items)).layout_
     
-    words_data = []
-    for (word, freq), font_size, position, orientation, color in wordcloud.layout_:
-        word_type = 'hashtag' if word.startswith('#') else 'keyword'
-        word_orientation = random.choice(['horizontal', 'vertical'])
-        words_data.append({
-            'word': word,
-            'font_size': int(font_size * 2),
-            'color': f'#{random.randint(0, 0xFFFFFF):06x}',
-            'tweet_volume': freq,
-            'type': word_type,
-            'orientation': word_orientation
-        })
+    # Draw all colors and orientations in one batch instead of per word
+    n = len(layout)
+    hex_colors = os.urandom(3 * n).hex()
+    colors = ['#' + hex_colors[i:i + 6] for i in range(0, 6 * n, 6)]
+    orientations = _RNG.integers(0, 2, size=n).tolist()
+    
+    words_data = [{
+        'word': word,
+        'font_size': int(font_size * 2),
+        'color': color,
+        'tweet_volume': freq,
+        'type': 'hashtag' if word.startswith('#') else 'keyword',
+        'orientation': _ORIENTATIONS[orientation]
+    } for ((word, freq), font_size, _, _, _), color, orientation in zip(layout, colors, orientations)]
     return words_data, width, height
 
+# Demo layout computed once at import; this also warms up the shared WordCloud (PIL/FreeType font loading)
+DEMO_LAYOUT = generate_wordcloud_layout(DEMO_WORDS)
+DEMO_WORDS_JSON = to_script_json(DEMO_LAYOUT[0])
+
+MAX_TWEET_PAGES = 5  # most search pages /fetch_tweets collects in one call
+
 @app.route('/fetch_tweets', methods=['POST'])
 @limiter.limit("30 per minute")
 @handle_api_error
 def fetch_tweets():
-    twitter_client = get_twitter_client()
-    if twitter_client is None:
+    if get_twitter_client() is None:
         return jsonify({'error': 'Twitter API is not configured. Please configure it in the settings page.'}), 503
     
     try:
@@ -275,39 +598,33 @@ def fetch_tweets():
             
         word = data.get('word')
         lang = data.get('lang', 'en')
+        pages = data.get('pages', 1)
         
         if not word:
             return jsonify({'error': 'No word provided'}), 400
+        if lang not in _LANG_SET:
+            return jsonify({'error': 'Unsupported language'}), 400
+        # type() rather than isinstance(), which would also accept JSON true/false as 1/0
+        if type(pages) is not int or not 1 <= pages <= MAX_TWEET_PAGES:
+            return jsonify({'error': f'pages must be between 1 and {MAX_TWEET_PAGES}'}), 400
             
         logger.info(f"Fetching tweets for word: {word}, language: {lang}")
         
-        # Fetch tweets using the v2 API
-        tweets = twitter_client.search_recent_tweets(
-            query=f"{word} -is:retweet lang:{lang}",
-            max_results=10,
-            tweet_fields=['created_at', 'text', 'public_metrics']
-        )
+        # Same cached lookup as the prefetched popups; extra pages are collected in full 100-tweet pages
+        if pages == 1:
+            tweets = fetch_top_5_recent_tweets(word, lang)
+        else:
+            tweets = fetch_top_5_recent_tweets(word, lang, 100, pages)
+        # handle_api_error hands failures back as an error response instead of raising
+        if not isinstance(tweets, list):
+            return tweets
         
-        if not tweets.data:
+        if not tweets:
             logger.warning(f"No tweets found for word: {word}")
             return jsonify({'tweets': []})
             
-        # Process tweets
-        processed_tweets = []
-        for tweet in tweets.data:
-            processed_tweets.append({
-                'text': tweet.text,
-                'url': f"https://twitter.com/user/status/{tweet.id}",
-                'metrics': {
-                    'retweet_count': tweet.public_metrics.get('retweet_count', 0),
-                    'reply_count': tweet.public_metrics.get('reply_count', 0),
-                    'like_count': tweet.public_metrics.get('like_count', 0)
-                },
-                'created_at': tweet.created_at.isoformat()
-            })
-            
-        logger.info(f"Successfully fetched {len(processed_tweets)} tweets")
-        return jsonify({'tweets': processed_tweets})
+        logger.info(f"Successfully fetched {len(tweets)} tweets")
+        return jsonify({'tweets': tweets})
         
     except tweepy.TweepyException as e:
         logger.error(f"Twitter API error: {str(e)}")
@@ -316,6 +633,133 @@ def fetch_tweets():
         logger.error(f"Unexpected error: {str(e)}")
         return jsonify({'error': 'An unexpected error occurred'}), 500
 
+def build_trends_payload(location, lang):
+    """Build the word cloud payload for a location, falling back to demo data if trends are unavailable."""
+    try:
+        trends = fetch_top_trends_by_location(location, lang)
+        # handle_api_error hands failures back as an (error response, status) pair after logging the cause
+        if not isinstance(trends, list):
+            response, status = trends
+            logger.warning(f"Trends for {location} unavailable ({status}: {response.get_json()['error']}), serving demo data")
+        elif trends:
+            frequencies = {t['name']: t['tweet_volume'] for t in trends}
+            words_data, canvas_width, canvas_height = generate_wordcloud_layout(frequencies)
+            return {
+                'words': words_data,
+                'tweets': fetch_tweets_for_trends(trends, lang),
+                'width': canvas_width,
+                'height': canvas_height,
+                'is_demo': False
+            }
+    except Exception as e:
+        logger.error(f"Error fetching trends for {location}: {e}")
+    
+    words_data, canvas_width, canvas_height = DEMO_LAYOUT
+    return {'words': words_data, 'tweets': {}, 'width': canvas_width, 'height': canvas_height, 'is_demo': True}
+
+@app.route('/trends')
+@limiter.limit("60 per minute")
+def trends():
+    """Word cloud data for a location as JSON, with an ETag so repeat fetches get a 304."""
+    location = request.args.get('location', '').strip()
+    lang = request.args.get('lang', 'en')
+    
+    is_valid, error_msg = validate_input(location, lang)
+    if not is_valid:
+        return jsonify({'error': error_msg}), 400
+    
+    payload = build_trends_payload(location, lang)
+    body = orjson.dumps(payload)
+    etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    if payload['is_demo']:
+        # Revalidate demo fallbacks so real trends show up as soon as the API recovers
+        response.cache_control.no_cache = True
+    else:
+        response.cache_control.public = True
+        response.cache_control.max_age = CACHE_TIMEOUT
+    # Flask-Compress sends compressed bodies with the ETag "<etag>:<encoding>", and that is what browsers send back;
+    # adopt the form being revalidated so make_conditional matches it and the 304 repeats the same validator
+    for algorithm in app.config['COMPRESS_ALGORITHM']:
+        if request.if_none_match.contains_weak(f"{etag}:{algorithm}"):
+            response.set_etag(f"{etag}:{algorithm}")
+            break
+    return response.make_conditional(request)
+
+# Background trend jobs - the API fetch and layout run off the request thread; results are kept in the cache
+_JOB_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix='trends-job')
+
+def _job_cache_key(job_id):
+    return f"trends_job:{job_id}"
+
+def _run_trends_job(job_id, location, lang):
+    """Build the trends payload for a job and store it for /result to return."""
+    try:
+        job = {'status': 'done', 'result': build_trends_payload(location, lang)}
+    except Exception as e:
+        logger.error(f"Trends job {job_id} failed: {e}")
+        job = {'status': 'failed', 'error': 'An unexpected error occurred'}
+    try:
+        cache.set(_job_cache_key(job_id), job, timeout=CACHE_TIMEOUT)
+    except redis.RedisError as e:
+        logger.error(f"Could not store result of trends job {job_id}: {e}")
+
+@app.route('/start_trends', methods=['POST'])
+@limiter.limit("60 per minute")
+def start_trends():
+    """Queue a word cloud build for a location and return a job id to poll."""
+    # Jobs live in the cache, and only Redis is shared by every worker that may answer the poll
+    if redis_pool is None:
+        return jsonify({'error': 'Background jobs require REDIS_URL to be configured'}), 503
+    
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    
+    location = (data.get('location') or '').strip()
+    lang = data.get('lang', 'en')
+    is_valid, error_msg = validate_input(location, lang)
+    if not is_valid:
+        return jsonify({'error': error_msg}), 400
+    
+    job_id = uuid.uuid4().hex
+    try:
+        cache.set(_job_cache_key(job_id), {'status': 'pending'}, timeout=CACHE_TIMEOUT)
+    except redis.RedisError as e:
+        logger.error(f"Could not store trends job {job_id}: {e}")
+        return jsonify({'error': 'Background jobs are temporarily unavailable'}), 503
+    # The job reads Twitter credentials from this request's session
+    _JOB_POOL.submit(copy_current_request_context(_run_trends_job), job_id, location, lang)
+    return jsonify({'job_id': job_id}), 202
+
+@app.route('/result/<job_id>')
+@limiter.limit("120 per minute")  # clients poll this repeatedly, so it gets its own limit instead of the hourly defaults
+def trends_result(job_id):
+    """Status of a trends job, with the word cloud payload once it is done."""
+    try:
+        job = cache.get(_job_cache_key(job_id))
+    except redis.RedisError as e:
+        logger.error(f"Could not read trends job {job_id}: {e}")
+        return jsonify({'error': 'Background jobs are temporarily unavailable'}), 503
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job'}), 404
+    if job['status'] == 'pending':
+        return jsonify(job), 202
+    return jsonify(job)
+
+def _render_demo(selected_lang='en'):
+    """Render the demo word cloud page from the precomputed layout."""
+    _, canvas_width, canvas_height = DEMO_LAYOUT
+    return render_template('wordcloud.html',
+                         display_name='Demo Trends',
+                         words_data_json=DEMO_WORDS_JSON,
+                         tweets_lookup='{}',
+                         canvas_width=canvas_width,
+                         canvas_height=canvas_height,
+                         selected_lang=selected_lang,
+                         is_demo=True)
+
 @app.route('/', methods=['GET', 'POST'])
 @limiter.limit("60 per minute")
 def index():
@@ -323,196 +767,41 @@ def index():
     twitter_client = get_twitter_client()
     if twitter_client is None:
         # Show demo word cloud instead of error
-        demo_words = {
-            '#Technology': 1200,
-            '#AI': 1000,
-            '#Innovation': 900,
-            '#DataScience': 850,
-            '#MachineLearning': 800,
-            '#Cloud': 750,
-            '#Cybersecurity': 700,
-            '#IoT': 650,
-            '#Blockchain': 600,
-            '#5G': 550,
-            'trending': 500,
-            'viral': 480,
-            'breaking': 460,
-            'news': 440,
-            'update': 420,
-            'latest': 400,
-            'popular': 380,
-            'hot': 360,
-            'buzz': 340,
-            'topic': 320
-        }
-        words_data, canvas_width, canvas_height = generate_wordcloud_layout(demo_words)
-        return render_template('wordcloud.html',
-                             display_name='Demo Trends',
-                             words_data=words_data,
-                             tweets_lookup=json.dumps({}),
-                             canvas_width=canvas_width,
-                             canvas_height=canvas_height,
-                             languages=SUPPORTED_LANGUAGES,
-                             selected_lang='en',
-                             is_demo=True)
+        return _render_demo()
     
     if request.method == 'GET':
-        # Fetch default US trends
-        try:
-            trends = fetch_top_trends_by_location('USA', 'en')
-            if trends:
-                frequencies = {t['name']: t['tweet_volume'] for t in trends}
-                words_data, canvas_width, canvas_height = generate_wordcloud_layout(frequencies)
-                return render_template('wordcloud.html',
-                                     display_name='USA',
-                                     words_data=words_data,
-                                     tweets_lookup=json.dumps({}),
-                                     canvas_width=canvas_width,
-                                     canvas_height=canvas_height,
-                                     languages=SUPPORTED_LANGUAGES,
-                                     selected_lang='en')
-        except Exception as e:
-            logger.error(f"Error fetching default trends: {e}")
-        
-        # Show demo mode if API call fails
-        demo_words = {
-            '#Technology': 1200,
-            '#AI': 1000,
-            '#Innovation': 900,
-            '#DataScience': 850,
-            '#MachineLearning': 800,
-            '#Cloud': 750,
-            '#Cybersecurity': 700,
-            '#IoT': 650,
-            '#Blockchain': 600,
-            '#5G': 550,
-            'trending': 500,
-            'viral': 480,
-            'breaking': 460,
-            'news': 440,
-            'update': 420,
-            'latest': 400,
-            'popular': 380,
-            'hot': 360,
-            'buzz': 340,
-            'topic': 320
-        }
-        words_data, canvas_width, canvas_height = generate_wordcloud_layout(demo_words)
-        return render_template('wordcloud.html',
-                             display_name='Demo Trends',
-                             words_data=words_data,
-                             tweets_lookup=json.dumps({}),
-                             canvas_width=canvas_width,
-                             canvas_height=canvas_height,
-                             languages=SUPPORTED_LANGUAGES,
-                             selected_lang='en',
-                             is_demo=True)
-    
-    location = request.form.get('location', '').strip()
-    lang = request.form.get('language', 'en')
-    
-    is_valid, error_msg = validate_location(location)
-    if not is_valid:
-        flash(error_msg, 'error')
-        return render_template('wordcloud.html', 
-                             error=error_msg,
-                             languages=SUPPORTED_LANGUAGES,
-                             selected_lang=lang)
-    
-    try:
-        trends = fetch_top_trends_by_location(location, lang)
-        if not trends:
-            # Show demo mode instead of error
-            demo_words = {
-                '#Technology': 1200,
-                '#AI': 1000,
-                '#Innovation': 900,
-                '#DataScience': 850,
-                '#MachineLearning': 800,
-                '#Cloud': 750,
-                '#Cybersecurity': 700,
-                '#IoT': 650,
-                '#Blockchain': 600,
-                '#5G': 550,
-                'trending': 500,
-                'viral': 480,
-                'breaking': 460,
-                'news': 440,
-                'update': 420,
-                'latest': 400,
-                'popular': 380,
-                'hot': 360,
-                'buzz': 340,
-                'topic': 320
-            }
-            words_data, canvas_width, canvas_height = generate_wordcloud_layout(demo_words)
-            return render_template('wordcloud.html',
-                                 display_name='Demo Trends',
-                                 words_data=words_data,
-                                 tweets_lookup=json.dumps({}),
-                                 canvas_width=canvas_width,
-                                 canvas_height=canvas_height,
-                                 languages=SUPPORTED_LANGUAGES,
-                                 selected_lang=lang,
-                                 is_demo=True)
+        # Default to US trends
+        location, lang = 'USA', 'en'
+    else:
+        location = request.form.get('location', '').strip()
+        lang = request.form.get('language', 'en')
         
-        frequencies = {t['name']: t['tweet_volume'] for t in trends}
-        words_data, canvas_width, canvas_height = generate_wordcloud_layout(frequencies)
-        return render_template('wordcloud.html',
-                             display_name=location,
-                             words_data=words_data,
-                             tweets_lookup=json.dumps({}),
-                             canvas_width=canvas_width,
-                             canvas_height=canvas_height,
-                             languages=SUPPORTED_LANGUAGES,
-                             selected_lang=lang)
+        is_valid, error_msg = validate_input(location, lang)
+        if not is_valid:
+            flash(error_msg, 'error')
+            return render_template('wordcloud.html', 
+                                 error=error_msg,
+                                 selected_lang=lang)
     
-    except Exception as e:
-        logger.error(f"Error in index route: {e}")
-        # Show demo mode instead of error
-        demo_words = {
-            '#Technology': 1200,
-            '#AI': 1000,
-            '#Innovation': 900,
-            '#DataScience': 850,
-            '#MachineLearning': 800,
-            '#Cloud': 750,
-            '#Cybersecurity': 700,
-            '#IoT': 650,
-            '#Blockchain': 600,
-            '#5G': 550,
-            'trending': 500,
-            'viral': 480,
-            'breaking': 460,
-            'news': 440,
-            'update': 420,
-            'latest': 400,
-            'popular': 380,
-            'hot': 360,
-            'buzz': 340,
-            'topic': 320
-        }
-        words_data, canvas_width, canvas_height = generate_wordcloud_layout(demo_words)
-        return render_template('wordcloud.html',
-                             display_name='Demo Trends',
-                             words_data=words_data,
-                             tweets_lookup=json.dumps({}),
-                             canvas_width=canvas_width,
-                             canvas_height=canvas_height,
-                             languages=SUPPORTED_LANGUAGES,
-                             selected_lang=lang,
-                             is_demo=True)
+    # Render the page shell; the word cloud data is fetched from /trends by the browser
+    return render_template('wordcloud.html',
+                         display_name=location,
+                         trends_url=url_for('trends', location=location, lang=lang),
+                         selected_lang=lang)
 
 @app.route('/config', methods=['GET', 'POST'])
 def config():
     """Configuration page for Twitter API credentials."""
     if request.method == 'POST':
-        # Save credentials to session
+        # Save credentials to session; permanent so PERMANENT_SESSION_LIFETIME expires them after an hour
+        session.permanent = True
         session['TWITTER_API_KEY'] = request.form.get('api_key', '').strip()
         session['TWITTER_API_SECRET'] = request.form.get('api_secret', '').strip()
         session['TWITTER_ACCESS_TOKEN'] = request.form.get('access_token', '').strip()
         session['TWITTER_ACCESS_TOKEN_SECRET'] = request.form.get('access_token_secret', '').strip()
         session['TWITTER_BEARER_TOKEN'] = request.form.get('bearer_token', '').strip()
+        # Drop credentials cached earlier in this request so the new values are read
+        g.pop('_twitter_creds', None)
         
         # Validate credentials
         creds = get_twitter_credentials()
@@ -50,6 +50,14 @@ function showTweets(word) {
     popup.style.display = 'block';
     popup.style.opacity = '1';
     
+    // Use tweets prefetched with the trends when available
+    const prefetched = window.tweets_lookup && window.tweets_lookup[word];
+    if (prefetched) {
+        list.innerHTML = '';
+        displayTweets(prefetched);
+        return;
+    }
+    
     // Get current language
     const languageSelect = document.querySelector('select[name="language"]');
     const language = languageSelect ? languageSelect.value : 'en';
@@ -170,8 +178,8 @@ document.addEventListener('DOMContentLoaded', function() {
     const wordcloudContainer = document.getElementById('wordcloud-container');
     const loadingOverlay = document.querySelector('.loading-overlay');
 
-    // Initialize word cloud if data is available
-    if (window.words_data && wordcloudContainer) {
+    // Render the word cloud for the given words
+    function renderWordCloud(wordsData) {
         const width = wordcloudContainer.offsetWidth;
         const height = wordcloudContainer.offsetHeight;
         
@@ -189,7 +197,7 @@ document.addEventListener('DOMContentLoaded', function() {
         // Create word cloud layout
         const layout = d3.layout.cloud()
             .size([width, height])
-            .words(window.words_data.map(d => ({
+            .words(wordsData.map(d => ({
                 text: d.word,
                 size: d.font_size,
                 type: d.type,
@@ -239,6 +247,49 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
+    // Initialize word cloud from inline data, or fetch it from the trends endpoint
+    if (window.words_data && wordcloudContainer) {
+        renderWordCloud(window.words_data);
+    } else if (window.trends_url && wordcloudContainer) {
+        if (loadingOverlay) {
+            loadingOverlay.classList.add('active');
+        }
+        fetch(window.trends_url)
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`HTTP error! status: ${response.status}`);
+                }
+                return response.json();
+            })
+            .then(data => {
+                window.tweets_lookup = data.tweets || {};
+                if (data.is_demo) {
+                    // Trends were unavailable; the server sent the demo cloud instead
+                    const demoBanner = document.getElementById('demoBanner');
+                    const trendsName = document.getElementById('trendsName');
+                    if (demoBanner) {
+                        demoBanner.style.display = '';
+                    }
+                    if (trendsName) {
+                        trendsName.textContent = 'Demo Trends';
+                    }
+                }
+                renderWordCloud(data.words);
+            })
+            .catch(error => {
+                console.error('Error fetching trends:', error);
+                const errorItem = document.createElement('div');
+                errorItem.className = 'flash-message error';
+                errorItem.textContent = `Error fetching trends: ${error.message}`;
+                wordcloudContainer.appendChild(errorItem);
+            })
+            .finally(() => {
+                if (loadingOverlay) {
+                    loadingOverlay.classList.remove('active');
+                }
+            });
+    }
+
     // Form submission handling
     if (trendForm) {
         trendForm.addEventListener('submit', function(e) {
@@ -0,0 +1,11 @@
+import os
+import sys
+
+# app.py reads its configuration at import time; run against the demo payload so no test needs the Twitter API
+os.environ.setdefault('SECRET_KEY', 'test-secret-key')
+os.environ['SESSION_COOKIE_SECURE'] = 'False'
+for name in ('TWITTER_API_KEY', 'TWITTER_API_SECRET', 'TWITTER_ACCESS_TOKEN',
+             'TWITTER_ACCESS_TOKEN_SECRET', 'TWITTER_BEARER_TOKEN', 'REDIS_URL'):
+    os.environ[name] = ''
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,35 @@
+import pytest
+
+from app import app, fetch_top_trends_by_location
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+@pytest.mark.parametrize('encoding', ['br', 'gzip', 'identity'])
+def test_trends_revalidates_with_returned_etag(client, encoding):
+    url = '/trends?location=USA&lang=en'
+    first = client.get(url, headers={'Accept-Encoding': encoding})
+    assert first.status_code == 200
+
+    second = client.get(url, headers={'Accept-Encoding': encoding, 'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 304
+    assert second.headers['ETag'] == first.headers['ETag']
+    assert second.data == b''
+
+
+def test_trend_counting_ignores_links(monkeypatch):
+    tweets = [{
+        'text': f'Check this out https://t.co/AbCdEfGh{i} #Fun great day',
+        'public_metrics': {'retweet_count': 0, 'reply_count': 0, 'like_count': 0}
+    } for i in range(20)]
+    monkeypatch.setattr('app._search_recent', lambda query, lang, max_results=100, pages=1: tweets)
+
+    trends = fetch_top_trends_by_location('LinkTestCity', 'en')
+
+    names = [trend['name'] for trend in trends]
+    assert names[0] == '#fun'
+    assert set(names) == {'#fun', 'check', 'this', 'great'}
+    assert all(trend['tweet_volume'] == 20 for trend in trends)